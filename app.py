@@ -1,45 +1,120 @@
-from flask import Flask, render_template, request, send_file, jsonify, session, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, send_file, jsonify, session, redirect, url_for, flash
+from flask.json.provider import DefaultJSONProvider
 from text_generation import TextGenerator
 from slides_generator import SlidesGenerator
 from payment_handler import PaystackHandler, PaymentSession
 from flask_bootstrap import Bootstrap
+from flask_caching import Cache
+from flask_compress import Compress
 from flask_wtf.csrf import CSRFProtect
 from flask_wtf import FlaskForm
+from jinja2 import FileSystemBytecodeCache
+from config import SETTINGS
 import os
+import re
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import uuid
 from dotenv import load_dotenv
 import logging
+import orjson
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; set LOG_LEVEL=DEBUG to see session and content dumps
+logging.basicConfig(level=SETTINGS.log_level)
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Serve jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-key-123')
+app.json = ORJSONProvider(app)
+app.config['SECRET_KEY'] = SETTINGS.secret_key
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp_presentations')
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Compiled templates persist across worker restarts; outside debug mode
+# Flask already skips the per-render freshness check (auto_reload).
+# With no directory, Jinja uses a per-user 0700 temp dir and refuses one it doesn't own.
+if not app.debug:
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+# Behind Apache/lighttpd, let the server stream downloads via X-Sendfile
+app.config['USE_X_SENDFILE'] = SETTINGS.use_x_sendfile
+# Compress text responses only; .pptx downloads are already zip archives
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_MIMETYPES'] = ['text/html', 'text/css', 'application/javascript', 'application/json']
+# Generated slide content is reused for repeat topics; Redis shares it across processes
+if SETTINGS.redis_url:
+    app.config['CACHE_TYPE'] = 'RedisCache'
+    app.config['CACHE_REDIS_URL'] = SETTINGS.redis_url
+else:
+    app.config['CACHE_TYPE'] = 'SimpleCache'
+app.config['CACHE_DEFAULT_TIMEOUT'] = 86400
+# With Redis available, keep sessions server-side so the cookie only carries an id
+if SETTINGS.redis_url:
+    from flask_session import Session
+    from redis import Redis
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = Redis.from_url(SETTINGS.redis_url)
+    Session(app)
 
 # Initialize extensions
 bootstrap = Bootstrap(app)
+compress = Compress(app)
+cache = Cache(app)
 csrf = CSRFProtect(app)
 
 # Initialize handlers
 try:
     text_generator = TextGenerator()
-    slides_generator = SlidesGenerator()
     paystack_handler = PaystackHandler()
     logger.info("Successfully initialized all handlers")
 except Exception as e:
-    logger.error(f"Error initializing handlers: {str(e)}", exc_info=True)
+    logger.error("Error initializing handlers: %s", e, exc_info=True)
     raise
 
+# Finished decks go to S3 when a bucket is configured, so downloads bypass this process
+# and survive restarts; otherwise they stay in UPLOAD_FOLDER
+S3_KEY_PREFIX = 'presentations/'
+S3_URL_EXPIRY = 300
+if SETTINGS.s3_bucket:
+    import boto3
+    s3_client = boto3.client('s3')
+else:
+    s3_client = None
+
 # Payment amount in GHS (or your preferred currency)
 PAYMENT_AMOUNT = 20.00
 
+# Cheap shape check so obviously bad addresses never reach Paystack
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Longest topic sent to OpenAI; prompt cost and latency grow with it
+MAX_TOPIC_LENGTH = 8000
+
+# Presentations are built off the request thread; clients poll /generate/status/<job_id>.
+# Jobs live in this process, so the app must run as a single worker process.
+generation_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='generate')
+generation_jobs = {}
+# Serializes charging a finished job against the free-slide allowance
+charge_lock = threading.Lock()
+# How long finished jobs stay pollable (seconds)
+GENERATION_JOB_TTL = 3600
+
+# Endpoints that never read the session; skipping them avoids minting a cookie per probe
+SESSIONLESS_ENDPOINTS = frozenset({'static', 'health_check'})
+
 # Create a simple form for CSRF protection
 class EmptyForm(FlaskForm):
     pass
@@ -47,9 +122,11 @@ class EmptyForm(FlaskForm):
 @app.before_request
 def check_session():
     """Ensure user has a session ID and payment session."""
+    if request.endpoint in SESSIONLESS_ENDPOINTS:
+        return
     if 'session_id' not in session:
         session['session_id'] = str(uuid.uuid4())
-        logger.debug(f"Created new session ID: {session['session_id']}")
+        logger.debug("Created new session ID: %s", session['session_id'])
     if 'payment_session' not in session:
         session['payment_session'] = PaymentSession(session['session_id']).__dict__
         logger.debug("Created new payment session")
@@ -61,7 +138,7 @@ def get_payment_session() -> PaymentSession:
         data = session['payment_session']
         payment_session = PaymentSession(data['session_id'])
         payment_session.__dict__.update(data)
-        logger.debug(f"Retrieved payment session: {payment_session.__dict__}")
+        logger.debug("Retrieved payment session: %s", payment_session.__dict__)
         return payment_session
     return PaymentSession(session['session_id'])
 
@@ -69,32 +146,92 @@ def save_payment_session(payment_session: PaymentSession):
     """Save payment session to Flask session."""
     session['payment_session'] = payment_session.__dict__
     session.modified = True
-    logger.debug(f"Saved payment session: {payment_session.__dict__}")
+    logger.debug("Saved payment session: %s", payment_session.__dict__)
+
+def content_cache_key(topic: str, max_slides: int) -> str:
+    """Cache key for generated content; topics differing only in case or padding share it."""
+    normalized = f"{topic.strip().lower()}|{max_slides}"
+    return 'content:' + hashlib.sha256(normalized.encode()).hexdigest()
+
+def build_presentation(topic: str, max_slides: int, output_path: str) -> str:
+    """Generate slide content and write the .pptx; runs on generation_executor.
+
+    Returns the filename clients should download, which is an earlier build's
+    file when the same topic has already been turned into a deck.
+    """
+    cache_key = content_cache_key(topic, max_slides)
+    deck_key = 'deck:' + cache_key
+    existing = cache.get(deck_key)
+    if existing and (s3_client or os.path.exists(os.path.join(app.config['UPLOAD_FOLDER'], existing))):
+        logger.info("Reusing presentation %s for topic: %s", existing, topic)
+        return existing
+
+    content = cache.get(cache_key)
+    if content is not None:
+        logger.info("Reusing cached content for topic: %s", topic)
+    else:
+        try:
+            content = text_generator(topic, max_slides=max_slides)
+            logger.debug("Generated content: %s", content)
+        except Exception as e:
+            logger.error("Text generation error: %s", e, exc_info=True)
+            raise
+
+    logger.info("Generating presentation at: %s", output_path)
+    try:
+        # A fresh generator per build keeps concurrent jobs off each other's slides
+        SlidesGenerator().generate_presentation(content, output_path)
+        logger.info("Presentation generated successfully")
+    except Exception as e:
+        logger.error("Slides generation error: %s", e, exc_info=True)
+        raise
+    # Only content that built a deck is worth reusing; bad output must not stick
+    cache.set(cache_key, content)
+
+    filename = os.path.basename(output_path)
+    if s3_client:
+        key = S3_KEY_PREFIX + filename
+        s3_client.upload_file(output_path, SETTINGS.s3_bucket, key)
+        os.remove(output_path)
+        logger.info("Uploaded presentation to s3://%s/%s", SETTINGS.s3_bucket, key)
+
+    cache.set(deck_key, filename)
+    return filename
+
+def prune_generation_jobs():
+    """Forget finished jobs that are older than GENERATION_JOB_TTL."""
+    cutoff = time.monotonic() - GENERATION_JOB_TTL
+    for job_id, job in list(generation_jobs.items()):
+        if job['future'].done() and job['created_at'] < cutoff:
+            generation_jobs.pop(job_id, None)
 
 @app.route('/')
 def index():
     form = EmptyForm()
     logger.debug("Rendering index page with CSRF form")
-    return render_template('index.html', form=form)
+    return render_template('index.html', form=form, max_topic_length=MAX_TOPIC_LENGTH)
 
 @app.route('/generate', methods=['POST'])
 def generate():
     try:
         logger.info("Starting presentation generation")
-        logger.debug(f"Form data: {request.form}")
         
-        topic = request.form.get('topic')
+        topic = request.form.get('topic', '').strip()
         if not topic:
             logger.warning("No topic provided in form data")
             return jsonify({'error': 'No topic provided'}), 400
+        if len(topic) > MAX_TOPIC_LENGTH:
+            logger.warning("Topic too long: %s characters", len(topic))
+            return jsonify({'error': f'Topic must be at most {MAX_TOPIC_LENGTH} characters'}), 413
 
         # Get payment session
         payment_session = get_payment_session()
-        logger.info(f"Payment session: {payment_session.__dict__}")
+        logger.debug("Payment session: %s", payment_session.__dict__)
         
-        # Check if user can generate more slides
-        can_continue, message = payment_session.increment_slides()
-        if not can_continue:
+        # Only check the limit here; the slide is counted once its build succeeds
+        if not payment_session.can_generate():
+            # At the limit this only flags payment_required and returns the notice
+            _, message = payment_session.increment_slides()
             save_payment_session(payment_session)
             logger.info("User reached free limit")
             return jsonify({
@@ -102,59 +239,92 @@ def generate():
                 'payment_required': True
             }), 402
 
-        # Generate content
-        logger.info(f"Generating content for topic: {topic}")
-        try:
-            content = text_generator(topic, max_slides=5 if not payment_session.payment_status else 10)
-            logger.debug(f"Generated content: {content}")
-        except Exception as e:
-            logger.error(f"Text generation error: {str(e)}", exc_info=True)
-            return jsonify({'error': str(e)}), 500
-
         # Create unique filename
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"presentation_{timestamp}.pptx"
+        job_id = uuid.uuid4().hex
+        filename = f"presentation_{timestamp}_{job_id[:8]}.pptx"
         output_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
 
-        # Generate presentation
-        logger.info(f"Generating presentation at: {output_path}")
-        try:
-            slides_generator.generate_presentation(content, output_path)
-            logger.info("Presentation generated successfully")
-        except Exception as e:
-            logger.error(f"Slides generation error: {str(e)}", exc_info=True)
-            return jsonify({'error': str(e)}), 500
-        
-        # Save session
-        save_payment_session(payment_session)
+        # Queue the build and return straight away
+        logger.info("Queueing presentation %s for topic: %s", job_id, topic)
+        prune_generation_jobs()
+        generation_jobs[job_id] = {
+            'future': generation_executor.submit(
+                build_presentation,
+                topic,
+                5 if not payment_session.payment_status else 10,
+                output_path
+            ),
+            'session_id': session['session_id'],
+            'charged': False,
+            'message': None,
+            'payment_status': payment_session.payment_status,
+            'created_at': time.monotonic()
+        }
 
         return jsonify({
             'success': True,
-            'filename': filename,
-            'message': message,
-            'payment_status': payment_session.payment_status
-        })
+            'status': 'pending',
+            'job_id': job_id,
+            'status_url': url_for('generation_status', job_id=job_id)
+        }), 202
 
     except Exception as e:
-        logger.error(f"Error generating presentation: {str(e)}", exc_info=True)
+        logger.error("Error generating presentation: %s", e, exc_info=True)
         return jsonify({
             'error': str(e) if app.debug else 'Something went wrong, please try again later'
         }), 500
 
+@app.route('/generate/status/<job_id>')
+def generation_status(job_id):
+    """Report the state of a queued presentation build."""
+    job = generation_jobs.get(job_id)
+    if job is None or job['session_id'] != session['session_id']:
+        return jsonify({'error': 'Unknown job'}), 404
+
+    future = job['future']
+    if not future.done():
+        return jsonify({'status': 'pending'}), 202
+
+    error = future.exception()
+    if error:
+        return jsonify({
+            'status': 'failed',
+            'error': str(error) if app.debug else 'Something went wrong, please try again later'
+        }), 500
+
+    # Failed builds cost nothing; a successful one is counted on the first poll that sees it
+    with charge_lock:
+        if not job['charged']:
+            payment_session = get_payment_session()
+            _, job['message'] = payment_session.increment_slides()
+            save_payment_session(payment_session)
+            job['charged'] = True
+
+    return jsonify({
+        'success': True,
+        'status': 'completed',
+        'filename': future.result(),
+        'message': job['message'],
+        'payment_status': job['payment_status']
+    })
+
 @app.route('/payment/initialize', methods=['POST'])
 def initialize_payment():
     try:
         logger.info("Starting payment initialization")
-        logger.debug(f"Form data: {request.form}")
         
-        email = request.form.get('email')
+        email = request.form.get('email', '').strip().lower()
         if not email:
             logger.warning("No email provided in form data")
             return jsonify({'error': 'Email is required'}), 400
+        if not EMAIL_PATTERN.match(email):
+            logger.warning("Invalid email provided in form data")
+            return jsonify({'error': 'Please enter a valid email address'}), 400
 
         # Initialize payment
         success, message, auth_url = paystack_handler.initialize_payment(email, PAYMENT_AMOUNT)
-        logger.info(f"Payment initialization result: success={success}, message={message}")
+        logger.info("Payment initialization result: success=%s, message=%s", success, message)
         
         if success and auth_url:
             return jsonify({
@@ -167,7 +337,7 @@ def initialize_payment():
         }), 400
 
     except Exception as e:
-        logger.error(f"Payment initialization error: {str(e)}", exc_info=True)
+        logger.error("Payment initialization error: %s", e, exc_info=True)
         return jsonify({
             'error': str(e) if app.debug else 'Failed to initialize payment'
         }), 500
@@ -176,7 +346,6 @@ def initialize_payment():
 def payment_callback():
     try:
         logger.info("Processing payment callback")
-        logger.debug(f"Callback args: {request.args}")
         
         reference = request.args.get('reference')
         if not reference:
@@ -184,13 +353,20 @@ def payment_callback():
             flash('Payment verification failed: No reference provided', 'error')
             return redirect(url_for('index'))
 
+        # A retried callback for an already-applied reference has nothing left to do
+        payment_session = get_payment_session()
+        if payment_session.payment_status and payment_session.transaction_ref == reference:
+            logger.info("Payment %s already applied to this session", reference)
+            flash('Payment successful! You now have unlimited access.', 'success')
+            return redirect(url_for('index'))
+
         # Verify payment
         success, message, transaction_data = paystack_handler.verify_payment(reference)
-        logger.info(f"Payment verification result: success={success}, message={message}")
+        logger.info("Payment verification result: success=%s, message=%s", success, message)
         
         if success:
             # Update payment session
-            payment_session = get_payment_session()
+            payment_session.set_transaction_ref(reference)
             payment_session.complete_payment()
             save_payment_session(payment_session)
             
@@ -200,14 +376,14 @@ def payment_callback():
 
         return redirect(url_for('index'))
     except Exception as e:
-        logger.error(f"Payment callback error: {str(e)}", exc_info=True)
+        logger.error("Payment callback error: %s", e, exc_info=True)
         flash('An error occurred while processing your payment', 'error')
         return redirect(url_for('index'))
 
 @app.route('/download/<filename>')
 def download(filename):
     try:
-        logger.info(f"Starting download for file: {filename}")
+        logger.info("Starting download for file: %s", filename)
         # Check payment status
         payment_session = get_payment_session()
         if not payment_session.payment_status:
@@ -216,19 +392,39 @@ def download(filename):
                 'error': 'Payment required to download presentations'
             }), 402
 
+        if s3_client:
+            url = s3_client.generate_presigned_url(
+                'get_object',
+                Params={
+                    'Bucket': SETTINGS.s3_bucket,
+                    'Key': S3_KEY_PREFIX + filename,
+                    'ResponseContentDisposition': f'attachment; filename="{filename}"'
+                },
+                ExpiresIn=S3_URL_EXPIRY
+            )
+            return redirect(url)
+
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         if not os.path.exists(file_path):
-            logger.error(f"File not found: {file_path}")
+            logger.error("File not found: %s", file_path)
             raise FileNotFoundError('Presentation file not found')
 
-        logger.info(f"Sending file: {file_path}")
+        if SETTINGS.x_accel_prefix:
+            # nginx serves the file from its internal location; no bytes pass through Python
+            return Response(headers={
+                'X-Accel-Redirect': SETTINGS.x_accel_prefix + filename,
+                'Content-Type': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+                'Content-Disposition': f'attachment; filename="{filename}"'
+            })
+
+        logger.info("Sending file: %s", file_path)
         return send_file(
             file_path,
             as_attachment=True,
             download_name=filename
         )
     except Exception as e:
-        logger.error(f"Download error: {str(e)}", exc_info=True)
+        logger.error("Download error: %s", e, exc_info=True)
         return jsonify({
             'error': str(e) if app.debug else 'File not found'
         }), 404
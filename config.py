@@ -1,8 +1,39 @@
 import os
+from dataclasses import dataclass
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+@dataclass(frozen=True)
+class Settings:
+    """Runtime settings, read from the environment once at import."""
+    secret_key: str
+    openai_api_key: Optional[str]
+    openai_rpm: int
+    openai_tpm: int
+    paystack_secret_key: Optional[str]
+    paystack_callback_url: str
+    use_x_sendfile: bool
+    x_accel_prefix: Optional[str]
+    redis_url: Optional[str]
+    s3_bucket: Optional[str]
+    log_level: str
+
+SETTINGS = Settings(
+    secret_key=os.environ.get('SECRET_KEY', 'dev-key-123'),
+    openai_api_key=os.getenv('OPENAI_API_KEY'),
+    openai_rpm=int(os.getenv('OPENAI_RPM', '3500')),
+    openai_tpm=int(os.getenv('OPENAI_TPM', '90000')),
+    paystack_secret_key=os.getenv('PAYSTACK_SECRET_KEY'),
+    paystack_callback_url=os.getenv('PAYSTACK_CALLBACK_URL', 'http://localhost:5000/payment/callback'),
+    use_x_sendfile=os.getenv('USE_X_SENDFILE', '0') == '1',
+    x_accel_prefix=os.getenv('X_ACCEL_REDIRECT_PREFIX'),
+    redis_url=os.getenv('REDIS_URL'),
+    s3_bucket=os.getenv('S3_BUCKET'),
+    log_level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+)
+
 class Config:
     SECRET_KEY = 'dev-secret-key-123'  # Fixed key for development
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///app.db')
@@ -1,10 +1,14 @@
-import multiprocessing
+import os
 
 # Gunicorn configuration
-bind = "0.0.0.0:10000"
-workers = multiprocessing.cpu_count() * 2 + 1
-worker_class = "gevent"
-timeout = 120
+bind = f"0.0.0.0:{os.getenv('PORT', '10000')}"
+# Generation jobs are tracked in process memory (app.generation_jobs), so
+# everything must run in one process; concurrency comes from threads instead.
+# Request threads mostly wait on Paystack/OpenAI, so they can outnumber cores.
+workers = 1
+worker_class = "gthread"
+threads = int(os.getenv('GUNICORN_THREADS', '16'))
+timeout = 180
 keepalive = 5
 errorlog = "-"  # stderr
 accesslog = "-"  # stdout
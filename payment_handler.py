@@ -1,20 +1,45 @@
-import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict
 from typing import Dict, Optional, Tuple
-import json
+import orjson
+from config import SETTINGS
+
+PAYSTACK_BASE_URL = "https://api.paystack.co"
+PAYSTACK_INITIALIZE_URL = f"{PAYSTACK_BASE_URL}/transaction/initialize"
+PAYSTACK_VERIFY_URL = f"{PAYSTACK_BASE_URL}/transaction/verify/"
+# (connect, read) seconds; a stalled Paystack call shouldn't pin a request thread
+PAYSTACK_TIMEOUT = (3.05, 10)
+
+# Successful verifications remembered per process; a verified reference never changes
+VERIFY_CACHE_SIZE = 4096
+
+# Shared session so Paystack calls reuse keep-alive connections.
+# Retry only applies to idempotent methods, so initialize POSTs are never replayed.
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+http_session.headers.update({"Content-Type": "application/json"})
 
 class PaystackHandler:
     def __init__(self):
         """Initialize Paystack payment handler."""
-        self.api_key = os.getenv('PAYSTACK_SECRET_KEY')
+        self.api_key = SETTINGS.paystack_secret_key
         if not self.api_key:
             raise ValueError("Paystack API key not found in environment variables")
         
-        self.base_url = "https://api.paystack.co"
         self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
+            "Authorization": f"Bearer {self.api_key}"
         }
+        # reference -> transaction_data for successful verifications, least recent first
+        self._verified: "OrderedDict[str, Dict]" = OrderedDict()
+        # Request threads share this handler, so the cache is only touched under the lock
+        self._verified_lock = threading.Lock()
 
     def initialize_payment(self, email: str, amount: float) -> Tuple[bool, str, Optional[str]]:
         """
@@ -28,22 +53,22 @@ class PaystackHandler:
             Tuple of (success: bool, message: str, authorization_url: Optional[str])
         """
         try:
-            url = f"{self.base_url}/transaction/initialize"
             payload = {
                 "email": email,
                 "amount": int(amount * 100),  # Convert to kobo/pesewas
                 "currency": "GHS",  # Change to your preferred currency
-                "callback_url": os.getenv('PAYSTACK_CALLBACK_URL', 'http://localhost:5000/payment/callback')
+                "callback_url": SETTINGS.paystack_callback_url
             }
 
-            response = requests.post(
-                url,
+            response = http_session.post(
+                PAYSTACK_INITIALIZE_URL,
                 headers=self.headers,
-                json=payload
+                json=payload,
+                timeout=PAYSTACK_TIMEOUT
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 if result['status']:
                     return True, "Payment initialization successful", result['data']['authorization_url']
                 return False, result.get('message', 'Payment initialization failed'), None
@@ -57,19 +82,36 @@ class PaystackHandler:
         """
         Verify a payment transaction using its reference.
         
+        Successful verifications are cached by reference, so repeat callbacks for
+        the same transaction don't hit the API again. Failures are never cached.
+
         Args:
             reference: Transaction reference to verify
             
         Returns:
             Tuple of (success: bool, message: str, transaction_data: Optional[Dict])
         """
+        with self._verified_lock:
+            cached = self._verified.get(reference)
+            if cached is not None:
+                self._verified.move_to_end(reference)
+        if cached is not None:
+            return True, "Payment verified successfully", cached
+
         try:
-            url = f"{self.base_url}/transaction/verify/{reference}"
-            response = requests.get(url, headers=self.headers)
+            response = http_session.get(
+                PAYSTACK_VERIFY_URL + reference,
+                headers=self.headers,
+                timeout=PAYSTACK_TIMEOUT
+            )
             
             if response.status_code == 200:
-                result = response.json()
+                result = orjson.loads(response.content)
                 if result['status'] and result['data']['status'] == 'success':
+                    with self._verified_lock:
+                        self._verified[reference] = result['data']
+                        if len(self._verified) > VERIFY_CACHE_SIZE:
+                            self._verified.popitem(last=False)
                     return True, "Payment verified successfully", result['data']
                 return False, "Payment verification failed", None
             
@@ -88,6 +130,10 @@ class PaymentSession:
         self.payment_required = False
         self.transaction_ref = None
 
+    def can_generate(self) -> bool:
+        """Check whether another presentation may be generated, without counting it."""
+        return self.payment_status or self.slides_generated < self.max_free_slides
+
     def increment_slides(self) -> Tuple[bool, str]:
         """
         Increment the number of slides generated and check if payment is required.
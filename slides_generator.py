@@ -1,12 +1,12 @@
-from pptx import Presentation
-from pptx.util import Inches, Pt
+from pptx.util import Pt
 from pptx.enum.text import PP_ALIGN
 from typing import Dict, List
+from utils import new_presentation
 
 class SlidesGenerator:
     def __init__(self):
         """Initialize the PowerPoint presentation generator."""
-        self.prs = Presentation()
+        self.prs = new_presentation()
         self._setup_slide_layouts()
 
     def _setup_slide_layouts(self):
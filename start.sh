@@ -14,4 +14,4 @@ which gunicorn
 gunicorn --version
 
 # Start the application
-exec gunicorn app:app --bind 0.0.0.0:$PORT --timeout 180
+exec gunicorn app:app --config gunicorn_config.py
@@ -2,7 +2,12 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_cors import CORS
+from sqlalchemy.orm import load_only, make_transient_to_detached
+from collections import OrderedDict
 import logging
+import os
+import threading
+import time
 
 # Set up logging
 logging.basicConfig(
@@ -11,19 +16,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Keep warm connections around and drop stale ones before use
+DB_ENGINE_OPTIONS = {
+    'pool_size': 20,
+    'max_overflow': 10,
+    'pool_pre_ping': True,
+    'pool_recycle': 1800,
+    # Fail fast instead of queueing forever when the pool is exhausted
+    'pool_timeout': 30
+}
+
 # Initialize extensions
 db = SQLAlchemy()
 login_manager = LoginManager()
 
+# user_id -> (loaded_at, (id, email, name)), so load_user skips the database on most requests.
+# Only plain column values are kept; each request rebuilds a User bound to its own session.
+USER_CACHE_TTL = 30
+USER_CACHE_SIZE = 10000
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+def forget_user(user_id):
+    """Drop a cached user so the next request reloads it from the database."""
+    with _user_cache_lock:
+        _user_cache.pop(str(user_id), None)
+
 def create_app():
     app = Flask(__name__)
     logger.info('Creating Flask application...')
     
     # Configure the app
+    database_uri = os.getenv('DATABASE_URL', 'sqlite:///app.db')
     app.config.update(
         SECRET_KEY='dev-secret-key-123',
-        SQLALCHEMY_DATABASE_URI='sqlite:///app.db',
+        SQLALCHEMY_DATABASE_URI=database_uri,
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        # SQLite doesn't use a sized connection pool, so only pool real servers
+        SQLALCHEMY_ENGINE_OPTIONS={} if database_uri.startswith('sqlite') else DB_ENGINE_OPTIONS,
         DEBUG=True
     )
     logger.info('App configuration complete')
@@ -40,7 +70,28 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        return models.User.query.get(int(user_id))
+        now = time.monotonic()
+        with _user_cache_lock:
+            cached = _user_cache.get(user_id)
+        if cached and now - cached[0] < USER_CACHE_TTL:
+            id_, email, name = cached[1]
+            user = models.User(id=id_, email=email, name=name)
+            make_transient_to_detached(user)
+            # Attach without a SELECT; other columns and relationships load lazily from this session
+            return db.session.merge(user, load=False)
+
+        # Session loads never need the password hash
+        user = db.session.get(
+            models.User,
+            int(user_id),
+            options=[load_only(models.User.id, models.User.email, models.User.name)]
+        )
+        if user is not None:
+            with _user_cache_lock:
+                _user_cache[user_id] = (now, (user.id, user.email, user.name))
+                if len(_user_cache) > USER_CACHE_SIZE:
+                    _user_cache.popitem(last=False)
+        return user
     
     with app.app_context():
         try:
@@ -56,21 +107,23 @@ def create_app():
             # Log all registered routes
             logger.info('Registered routes:')
             for rule in app.url_map.iter_rules():
-                logger.info(f'  {rule.rule} -> {rule.endpoint} [{", ".join(rule.methods)}]')
+                logger.info('  %s -> %s [%s]', rule.rule, rule.endpoint, ", ".join(rule.methods))
             
             logger.info('Routes registered successfully')
             
-            # Create database tables
-            db.create_all()
-            logger.info('Database tables created successfully')
-            
         except Exception as e:
-            logger.error(f'Error during app initialization: {str(e)}')
+            logger.error('Error during app initialization: %s', e)
             raise
         
+        @app.cli.command('init-db')
+        def init_db():
+            """Create database tables; run once per deploy rather than on every worker boot."""
+            db.create_all()
+            logger.info('Database tables created successfully')
+        
         @app.after_request
         def after_request(response):
-            logger.debug(f'Request completed: {response.status}')
+            logger.debug('Request completed: %s', response.status)
             return response
         
         return app
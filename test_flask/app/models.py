@@ -1,23 +1,47 @@
 from datetime import datetime
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from . import db
 
+# Argon2id with costs tuned to roughly 50ms per hash
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     name = db.Column(db.String(80))
     password_hash = db.Column(db.String(128))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    presentations = db.relationship('Presentation', backref='user', lazy=True)
+    # A query rather than a loaded list, so filters, counts and paging run in SQL
+    presentations = db.relationship('Presentation', backref='user', lazy='dynamic')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify a password, upgrading legacy or outdated hashes in place.
+
+        An upgraded hash only marks the row dirty; the caller's next commit saves it.
+        """
+        if not self.password_hash:
+            return False
+        if not self.password_hash.startswith('$argon2'):
+            # Werkzeug pbkdf2 hashes from before the switch to argon2
+            if not check_password_hash(self.password_hash, password):
+                return False
+            self.set_password(password)
+            return True
+        try:
+            password_hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        if password_hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -32,5 +56,10 @@ class Presentation(db.Model):
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
 
+    __table_args__ = (
+        # Per-user listings, newest first
+        db.Index('ix_presentations_user_created', 'user_id', created_at.desc()),
+    )
+
     def __repr__(self):
         return f'<Presentation {self.title}>'
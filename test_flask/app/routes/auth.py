@@ -1,6 +1,9 @@
 from flask import jsonify, request, Blueprint
-from flask_login import login_user, logout_user, login_required
+from flask_login import current_user, login_user, logout_user, login_required
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
 from ..models import User, db
+from .. import forget_user
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +15,6 @@ def register():
     logger.info('Handling registration request')
     try:
         data = request.get_json()
-        logger.debug(f'Registration request data: {data}')
         
         if not data:
             logger.error('No JSON data in request')
@@ -22,8 +24,8 @@ def register():
             logger.error('Missing required fields in registration request')
             return jsonify({'error': 'Email and password are required'}), 400
         
-        if User.query.filter_by(email=data['email']).first():
-            logger.warning(f'Email already registered: {data["email"]}')
+        if db.session.scalar(select(User.id).where(User.email == data['email'])):
+            logger.warning('Email already registered: %s', data["email"])
             return jsonify({'error': 'Email already registered'}), 400
             
         try:
@@ -37,7 +39,7 @@ def register():
             db.session.commit()
             
             login_user(user)
-            logger.info(f'User registered successfully: {user.email}')
+            logger.info('User registered successfully: %s', user.email)
             return jsonify({
                 'message': 'Registration successful',
                 'user': {
@@ -47,11 +49,11 @@ def register():
                 }
             }), 201
         except Exception as e:
-            logger.error(f'Database error during registration: {str(e)}')
+            logger.error('Database error during registration: %s', e)
             db.session.rollback()
             return jsonify({'error': 'Registration failed'}), 500
     except Exception as e:
-        logger.error(f'Unexpected error during registration: {str(e)}')
+        logger.error('Unexpected error during registration: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/login', methods=['POST'])
@@ -59,7 +61,6 @@ def login():
     logger.info('Handling login request')
     try:
         data = request.get_json()
-        logger.debug(f'Login request data: {data}')
         
         if not data:
             logger.error('No JSON data in request')
@@ -69,11 +70,19 @@ def login():
             logger.error('Missing required fields in login request')
             return jsonify({'error': 'Email and password are required'}), 400
         
-        user = User.query.filter_by(email=data['email']).first()
+        # One query for just the columns login and the response need
+        user = db.session.scalar(
+            select(User)
+            .options(load_only(User.id, User.email, User.name, User.password_hash))
+            .where(User.email == data['email'])
+        )
         
         if user and user.check_password(data['password']):
+            if db.session.dirty:
+                # check_password upgraded an old hash
+                db.session.commit()
             login_user(user)
-            logger.info(f'User logged in successfully: {user.email}')
+            logger.info('User logged in successfully: %s', user.email)
             return jsonify({
                 'message': 'Login successful',
                 'user': {
@@ -83,10 +92,10 @@ def login():
                 }
             }), 200
         
-        logger.warning(f'Failed login attempt for email: {data.get("email")}')
+        logger.warning('Failed login attempt for email: %s', data.get("email"))
         return jsonify({'error': 'Invalid email or password'}), 401
     except Exception as e:
-        logger.error(f'Unexpected error during login: {str(e)}')
+        logger.error('Unexpected error during login: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/logout', methods=['POST'])
@@ -94,8 +103,9 @@ def login():
 def logout():
     logger.info('Handling logout request')
     try:
+        forget_user(current_user.id)
         logout_user()
         return jsonify({'message': 'Logged out successfully'}), 200
     except Exception as e:
-        logger.error(f'Error during logout: {str(e)}')
+        logger.error('Error during logout: %s', e)
         return jsonify({'error': 'Logout failed'}), 500
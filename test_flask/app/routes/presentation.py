@@ -12,7 +12,10 @@ bp = Blueprint('presentations', __name__)
 def list_presentations():
     logger.info('Listing presentations for user')
     try:
-        presentations = Presentation.query.filter_by(user_id=current_user.id).all()
+        presentations = (Presentation.query
+                         .filter_by(user_id=current_user.id)
+                         .order_by(Presentation.created_at.desc())
+                         .all())
         return jsonify({
             'presentations': [{
                 'id': p.id,
@@ -23,7 +26,7 @@ def list_presentations():
             } for p in presentations]
         }), 200
     except Exception as e:
-        logger.error(f'Error listing presentations: {str(e)}')
+        logger.error('Error listing presentations: %s', e)
         return jsonify({'error': 'Failed to list presentations'}), 500
 
 @bp.route('/', methods=['POST'])
@@ -32,7 +35,7 @@ def create_presentation():
     logger.info('Creating new presentation')
     try:
         data = request.get_json()
-        logger.debug(f'Presentation creation data: {data}')
+        logger.debug('Presentation creation data: %s', data)
         
         if not data:
             logger.error('No JSON data in request')
@@ -52,7 +55,7 @@ def create_presentation():
             db.session.add(presentation)
             db.session.commit()
             
-            logger.info(f'Presentation created successfully: {presentation.id}')
+            logger.info('Presentation created successfully: %s', presentation.id)
             return jsonify({
                 'message': 'Presentation created successfully',
                 'presentation': {
@@ -64,22 +67,22 @@ def create_presentation():
                 }
             }), 201
         except Exception as e:
-            logger.error(f'Database error during presentation creation: {str(e)}')
+            logger.error('Database error during presentation creation: %s', e)
             db.session.rollback()
             return jsonify({'error': 'Failed to create presentation'}), 500
     except Exception as e:
-        logger.error(f'Unexpected error during presentation creation: {str(e)}')
+        logger.error('Unexpected error during presentation creation: %s', e)
         return jsonify({'error': 'Internal server error'}), 500
 
 @bp.route('/<int:id>', methods=['GET'])
 @login_required
 def get_presentation(id):
-    logger.info(f'Getting presentation {id}')
+    logger.info('Getting presentation %s', id)
     try:
         presentation = Presentation.query.filter_by(id=id, user_id=current_user.id).first()
         
         if not presentation:
-            logger.warning(f'Presentation {id} not found')
+            logger.warning('Presentation %s not found', id)
             return jsonify({'error': 'Presentation not found'}), 404
             
         return jsonify({
@@ -92,5 +95,5 @@ def get_presentation(id):
             }
         }), 200
     except Exception as e:
-        logger.error(f'Error getting presentation: {str(e)}')
+        logger.error('Error getting presentation: %s', e)
         return jsonify({'error': 'Failed to get presentation'}), 500
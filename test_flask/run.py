@@ -6,7 +6,7 @@ from urllib.parse import unquote
 # Add the parent directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import create_app
+from app import create_app, db
 import logging
 
 # Set up logging
@@ -19,6 +19,10 @@ logger = logging.getLogger(__name__)
 app = create_app()
 
 if __name__ == '__main__':
+    # The dev server creates its own tables; deployments run `flask init-db`
+    with app.app_context():
+        db.create_all()
+
     # Print all registered routes
     print('\nRegistered routes:')
     for rule in app.url_map.iter_rules():
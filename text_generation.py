@@ -1,61 +1,74 @@
-from openai import OpenAI
+from functools import cached_property
 from typing import Dict, List
-import os
 import httpx
+from config import SETTINGS
+from utils.rate_limit import estimate_tokens, openai_limiter
+
+SYSTEM_PROMPT = """You are a professional presentation creator. Create clear, engaging, and informative presentation content.
+
+Requirements:
+1. Generate exactly the number of slides requested
+2. Each slide should have:
+   - A clear, specific title
+   - 3-4 detailed bullet points that support the title
+3. Content should be:
+   - Professional and accurate
+   - Easy to understand
+   - Logically structured
+   - Free of repetition
+4. Do not include basic definitions or obvious statements
+5. Include specific examples and real-world applications
+
+Format the response exactly as follows:
+Title: [Presentation Title]
+
+Slide 1: [Slide Title]
+- [Bullet Point 1]
+- [Bullet Point 2]
+- [Bullet Point 3]
+
+Slide 2: [Slide Title]
+[Continue for all slides...]"""
 
 class TextGenerator:
     def __init__(self):
         """Initialize the OpenAI text generator."""
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
+        self.api_key = SETTINGS.openai_api_key
+        if not self.api_key:
             raise ValueError("OpenAI API key not found in environment variables")
-        self.client = OpenAI(
-            api_key=api_key,
-            http_client=httpx.Client(timeout=30.0)
+
+    @cached_property
+    def client(self):
+        """OpenAI client, created on first use rather than at worker boot."""
+        # openai pulls in pydantic and its generated types; import it with the client
+        from openai import OpenAI
+        return OpenAI(
+            api_key=self.api_key,
+            http_client=httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30.0
+            )
         )
 
     def generate_slide_content(self, topic: str, max_slides: int = 5) -> Dict[str, List[str]]:
         """Generate content for PowerPoint slides based on the given topic."""
         try:
-            # Create a structured prompt for ChatGPT
-            system_prompt = """You are a professional presentation creator. Create clear, engaging, and informative presentation content."""
-            
-            user_prompt = f"""Create a presentation about: {topic}
-
-            Requirements:
-            1. Generate exactly {max_slides} slides
-            2. Each slide should have:
-               - A clear, specific title
-               - 3-4 detailed bullet points that support the title
-            3. Content should be:
-               - Professional and accurate
-               - Easy to understand
-               - Logically structured
-               - Free of repetition
-            4. Do not include basic definitions or obvious statements
-            5. Include specific examples and real-world applications
-
-            Format the response exactly as follows:
-            Title: [Presentation Title]
+            # Only the topic and slide count vary; everything else lives in the
+            # fixed system prompt so OpenAI can reuse the cached prefix
+            user_prompt = f"Create a presentation about: {topic}\n\nGenerate exactly {max_slides} slides."
 
-            Slide 1: [Slide Title]
-            - [Bullet Point 1]
-            - [Bullet Point 2]
-            - [Bullet Point 3]
-
-            Slide 2: [Slide Title]
-            [Continue for all slides...]"""
-
-            # Call ChatGPT API
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
+            # Call ChatGPT API, waiting for quota rather than running into 429s
+            with openai_limiter.reserve(estimate_tokens(SYSTEM_PROMPT, user_prompt, max_tokens=2000)):
+                response = self.client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=2000
+                )
 
             # Process the response
             content = response.choices[0].message.content
@@ -1,3 +1,5 @@
-from .utils import check_user_limits, get_max_slides, add_watermark, generate_presentation_content, create_ppt
+from .utils import check_user_limits, get_max_slides, add_watermark, generate_presentation_content, create_ppt, new_presentation
+from .rate_limit import TokenBucket, estimate_tokens, openai_limiter
 
-__all__ = ['check_user_limits', 'get_max_slides', 'add_watermark', 'generate_presentation_content', 'create_ppt']
+__all__ = ['check_user_limits', 'get_max_slides', 'add_watermark', 'generate_presentation_content', 'create_ppt', 'new_presentation',
+           'TokenBucket', 'estimate_tokens', 'openai_limiter']
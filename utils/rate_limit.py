@@ -0,0 +1,66 @@
+import threading
+import time
+from contextlib import contextmanager
+from config import SETTINGS
+
+class TokenBucket:
+    def __init__(self, rpm=3500, tpm=90000):
+        """Token bucket that keeps OpenAI calls under a requests- and tokens-per-minute quota."""
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._penalty_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        """Add capacity for the time elapsed since the last refill."""
+        elapsed = now - self._updated
+        self._updated = now
+        # Refill at half speed for a while after the API has pushed back
+        rate = 0.5 if now < self._penalty_until else 1.0
+        self._requests = min(self.rpm, self._requests + elapsed * rate * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * rate * self.tpm / 60)
+
+    def acquire(self, tokens):
+        """Block until one request and the estimated number of tokens are available."""
+        tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (tokens - self._tokens) * 60 / self.tpm,
+                    0.01
+                )
+            time.sleep(wait)
+
+    def penalize(self, seconds=60):
+        """Slow the refill rate after a 429 so retries don't hit the limit again."""
+        with self._lock:
+            self._penalty_until = time.monotonic() + seconds
+
+    @contextmanager
+    def reserve(self, tokens):
+        """Reserve capacity for one call and back off if it is rate limited."""
+        self.acquire(tokens)
+        try:
+            yield
+        except Exception as e:
+            # openai.RateLimitError; matched by status so this module doesn't import openai
+            if getattr(e, 'status_code', None) == 429:
+                self.penalize()
+            raise
+
+def estimate_tokens(*texts, max_tokens=0):
+    """Rough token count for a request: ~4 characters per token plus the completion budget."""
+    return sum(len(text) for text in texts) // 4 + max_tokens
+
+# Shared by every OpenAI call made from this process
+openai_limiter = TokenBucket(rpm=SETTINGS.openai_rpm, tpm=SETTINGS.openai_tpm)
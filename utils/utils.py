@@ -1,11 +1,45 @@
-import os
 import io
 from datetime import datetime
+from functools import lru_cache
 from pptx import Presentation as PPTXPresentation
 from pptx.util import Inches, Pt
 from PIL import Image, ImageDraw, ImageFont
 import requests
-from openai import OpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import httpx
+from config import SETTINGS
+from .rate_limit import estimate_tokens, openai_limiter
+
+# (connect, read) seconds per attempt; a stalled image host shouldn't hang a build
+IMAGE_FETCH_TIMEOUT = (3.05, 10)
+
+# Shared session so image downloads reuse keep-alive connections
+http_session = requests.Session()
+http_session.mount('https://', HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Slide limit per subscription type
+MAX_SLIDES = {
+    'free': 5,
+    'pro': 15,
+    'business': 30
+}
+
+def _load_default_template():
+    """Serialize python-pptx's default template once so decks start from in-memory bytes."""
+    buffer = io.BytesIO()
+    PPTXPresentation().save(buffer)
+    return buffer.getvalue()
+
+DEFAULT_TEMPLATE = _load_default_template()
+
+def new_presentation():
+    """Start a presentation from the cached default template instead of re-reading it from disk."""
+    return PPTXPresentation(io.BytesIO(DEFAULT_TEMPLATE))
 
 def check_user_limits(user):
     """Check if user has reached their presentation limits."""
@@ -17,29 +51,30 @@ def check_user_limits(user):
 
 def get_max_slides(user):
     """Get maximum number of slides based on user's subscription."""
-    limits = {
-        'free': 5,
-        'pro': 15,
-        'business': 30
-    }
-    return limits.get(user.subscription_type, 5)
+    return MAX_SLIDES.get(user.subscription_type, MAX_SLIDES['free'])
+
+@lru_cache(maxsize=1)
+def _watermark_font():
+    """Load the watermark font once; a missing arial.ttf is otherwise searched for on every image."""
+    try:
+        return ImageFont.truetype("arial.ttf", 30)
+    except OSError:
+        return ImageFont.load_default()
 
 def add_watermark(image_path, watermark_text):
     """Add watermark to an image."""
     # Open the image
     with Image.open(image_path) as img:
-        # Create a copy to draw on
-        watermarked = img.copy()
+        # Draw straight onto the decoded frame; the source is never written back,
+        # so a full-size copy would only double peak memory
+        watermarked = img
         
         # Create drawing context
         draw = ImageDraw.Draw(watermarked)
         
         # Calculate text size and position
         width, height = img.size
-        try:
-            font = ImageFont.truetype("arial.ttf", 30)
-        except:
-            font = ImageFont.load_default()
+        font = _watermark_font()
             
         # Add watermark text
         text_width = draw.textlength(watermark_text, font=font)
@@ -57,9 +92,22 @@ def add_watermark(image_path, watermark_text):
         
         return img_byte_arr
 
+@lru_cache(maxsize=1)
+def _openai_client():
+    """Create the OpenAI client once, on first use, over a pooled HTTP/2 connection."""
+    from openai import OpenAI
+    return OpenAI(
+        api_key=SETTINGS.openai_api_key,
+        http_client=httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=60.0
+        )
+    )
+
 def generate_presentation_content(topic, num_slides):
     """Generate presentation content using OpenAI."""
-    client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    client = _openai_client()
     
     prompt = f"""Create a presentation outline for {topic} with {num_slides} slides.
     For each slide include:
@@ -69,22 +117,31 @@ def generate_presentation_content(topic, num_slides):
     Format as a JSON array where each object has: title, points (array), and image_suggestion."""
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a presentation expert. Create clear, engaging slides."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
+        with openai_limiter.reserve(estimate_tokens(prompt, max_tokens=2000)):
+            response = client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a presentation expert. Create clear, engaging slides."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                max_tokens=2000
+            )
         return response.choices[0].message.content
     except Exception as e:
         print(f"Error generating content: {str(e)}")
         return None
 
+def _download_image(url):
+    """Fetch image bytes, or None if the server didn't return them."""
+    response = http_session.get(url, timeout=IMAGE_FETCH_TIMEOUT)
+    if response.status_code != 200:
+        return None
+    return response.content
+
 def create_ppt(content, watermark=None):
     """Create a PowerPoint presentation from content."""
-    prs = PPTXPresentation()
+    prs = new_presentation()
     
     # Set slide dimensions to 16:9
     prs.slide_width = Inches(16)
@@ -110,9 +167,9 @@ def create_ppt(content, watermark=None):
         # If there's an image suggestion and it's a URL, try to add it
         if 'image' in slide_content and slide_content['image'].startswith('http'):
             try:
-                response = requests.get(slide_content['image'])
-                if response.status_code == 200:
-                    img_stream = io.BytesIO(response.content)
+                image_bytes = _download_image(slide_content['image'])
+                if image_bytes:
+                    img_stream = io.BytesIO(image_bytes)
                     
                     # Add watermark if specified
                     if watermark: